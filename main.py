@@ -5,14 +5,50 @@
 自动读取Excel文件，计算p值，并输出结果
 """
 
+from itertools import chain
+
+import numpy as np
+
 from p_value_calculator import (
-    load_data_from_excel, 
-    batch_calculate_p_values, 
-    print_batch_results,
-    save_results_to_csv,
-    save_results_to_excel
+    iter_excel_chunks, 
+    batch_calculate_p_values_columnar, 
+    records_to_dicts, 
+    format_batch_results,
+    print_batch_title,
+    print_batch_counts,
+    print_batch_table_header,
+    save_result_chunks
 )
 
+def compute_result_chunks(chunks, summary):
+    """
+    逐块计算p值并转换为结果字典，每块的打印行随即输出，统计信息累计到summary中，同一时间只保留一块结果字典
+    
+    为计算p值中位数，成功结果的p值以float64数组累计保存，占用随总行数线性增长 (每条8字节)
+    
+    参数:
+    chunks: iter_excel_chunks返回的按列数据块
+    summary: 累计统计信息的字典
+    """
+    row_offset = 0
+    for columns in chunks:
+        records = batch_calculate_p_values_columnar(columns, "simple", 0.05)
+        results = records_to_dicts(records, range(row_offset + 1, row_offset + len(records) + 1), columns.keys())
+        row_offset += len(records)
+        
+        lines, error_count, significant_count = format_batch_results(results)
+        if lines:
+            print("\n".join(lines))
+        summary['total_count'] += len(results)
+        summary['error_count'] += error_count
+        summary['significant_count'] += significant_count
+        
+        # 只保存成功结果的p值和显著性水平，用于最后的数据摘要
+        valid = records.error_code == 0
+        summary['p_values'].append(records.p_value[valid])
+        summary['alpha_levels'].update(np.unique(records.alpha[valid]).tolist())
+        yield results
+
 def process_sample_data():
     """
     处理sample_data.xlsx文件
@@ -22,16 +58,14 @@ def process_sample_data():
     print("=" * 60)
     
     try:
-        # 从Excel文件加载数据
-        print("正在读取sample_data.xlsx...")
-        data_list = load_data_from_excel('sample_data.xlsx')
-        print(f"成功读取数据，共 {len(data_list)} 条记录")
-        
-        print(f"成功加载 {len(data_list)} 条数据")
+        # 分块读取Excel文件，每块读取后立即计算、打印并写出，不保留全部结果字典
+        print("正在分块读取sample_data.xlsx...")
+        chunks = iter_excel_chunks('sample_data.xlsx')
+        first_chunk = next(chunks, None)
         
         # 检查数据格式
-        if data_list:
-            sample_data = data_list[0]
+        if first_chunk is not None:
+            sample_data = {name: values[0].item() for name, values in first_chunk.items()}
             print("\n数据字段检查:")
             print(f"- coefficient: {sample_data.get('coefficient', 'N/A')}")
             print(f"- std_error: {sample_data.get('std_error', 'N/A')}")
@@ -39,30 +73,36 @@ def process_sample_data():
             print(f"- significant_level: {sample_data.get('significant_level', 'N/A')}")
             
             # 检查是否有significant_level字段
-            has_significant_level = any('significant_level' in data for data in data_list)
-            if has_significant_level:
+            if 'significant_level' in first_chunk:
                 print("✓ 检测到significant_level字段，将使用每行数据的显著性水平")
             else:
                 print("⚠ 未检测到significant_level字段，将使用默认显著性水平0.05")
+            chunks = chain([first_chunk], chunks)
         
-        # 批量计算p值
-        print("\n正在计算p值...")
-        results = batch_calculate_p_values(data_list, "simple", 0.05)
-        
-        # 显示结果
-        print_batch_results(results)
-        
-        # 保存结果
-        print("\n正在保存结果...")
-        save_results_to_csv(results, 'sample_data_results.csv')
-        save_results_to_excel(results, 'sample_data_results.xlsx')
+        # 逐块计算p值并追加保存结果
+        print("\n正在计算p值并保存结果...")
+        summary = {
+            'total_count': 0,
+            'error_count': 0,
+            'significant_count': 0,
+            'p_values': [],
+            'alpha_levels': set()
+        }
+        # 表头先打印，每块结果计算后立即打印，统计信息在全部处理完后打印
+        print_batch_title()
+        print_batch_table_header()
+        save_result_chunks(compute_result_chunks(chunks, summary),
+                           'sample_data_results.csv', 'sample_data_results.xlsx')
+        summary['p_values'] = np.concatenate(summary['p_values']) if summary['p_values'] else np.zeros(0)
+        print(f"成功处理数据，共 {summary['total_count']} 条记录")
+        print_batch_counts(summary['total_count'], summary['error_count'], summary['significant_count'])
         
         print("\n处理完成！")
         print("输出文件:")
         print("- sample_data_results.csv")
         print("- sample_data_results.xlsx")
         
-        return results
+        return summary
         
     except FileNotFoundError:
         print("错误: 找不到sample_data.xlsx文件")
@@ -72,51 +112,52 @@ def process_sample_data():
         print(f"处理过程中出现错误: {e}")
         return None
 
-def show_data_summary(results):
+def show_data_summary(summary):
     """
     显示数据摘要
+    
+    参数:
+    summary: process_sample_data返回的统计信息
     """
-    if not results:
+    if not summary or not summary['total_count']:
         return
     
     print("\n" + "=" * 60)
     print("数据摘要")
     print("=" * 60)
     
-    total_count = len(results)
-    error_count = sum(1 for r in results if 'error' in r)
+    total_count = summary['total_count']
+    error_count = summary['error_count']
     success_count = total_count - error_count
-    significant_count = sum(1 for r in results if r.get('is_significant', False))
+    p_values = summary['p_values']
+    alpha_levels = summary['alpha_levels']
     
     print(f"总数据条数: {total_count}")
     print(f"成功计算: {success_count}")
     print(f"计算错误: {error_count}")
-    print(f"显著结果: {significant_count}")
+    print(f"显著结果: {summary['significant_count']}")
     
     if success_count > 0:
         # 统计p值分布
-        p_values = [r.get('p_value', 0) for r in results if 'p_value' in r and 'error' not in r]
-        if p_values:
-            import statistics
+        if len(p_values):
             print(f"\nP值统计:")
-            print(f"最小p值: {min(p_values):.6f}")
-            print(f"最大p值: {max(p_values):.6f}")
-            print(f"平均p值: {statistics.mean(p_values):.6f}")
-            print(f"中位数p值: {statistics.median(p_values):.6f}")
+            print(f"最小p值: {p_values.min():.6f}")
+            print(f"最大p值: {p_values.max():.6f}")
+            print(f"平均p值: {p_values.mean():.6f}")
+            print(f"中位数p值: {np.median(p_values):.6f}")
             
             # 显著性水平分布
-            alpha_levels = [r.get('used_alpha', r.get('alpha', 0)) for r in results if 'used_alpha' in r or 'alpha' in r]
             if alpha_levels:
-                unique_alphas = list(set(alpha_levels))
+                unique_alphas = list(alpha_levels)
                 print(f"\n使用的显著性水平: {unique_alphas}")
 
 if __name__ == "__main__":
     # 处理sample_data.xlsx文件
-    results = process_sample_data()
+    summary = process_sample_data()
     
-    if results:
+    if summary:
         # 显示数据摘要
-        show_data_summary(results)
+        show_data_summary(summary)
         
         print("\n" + "=" * 60)
         print("处理完成！")
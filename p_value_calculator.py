@@ -6,49 +6,233 @@ P值计算器
 """
 
 import numpy as np
-from scipy import stats
+from scipy.special import stdtr, stdtrit
+import importlib.util
 import math
-import pandas as pd
-import csv
-import json
+import os
+import sys
+import numbers
+import operator
+import multiprocessing as mp
+from functools import lru_cache
 from typing import List, Dict, Union
 
-def calculate_p_value(coefficient, std_error, sample_size, alpha=0.05):
+# pandas、Excel引擎等重量级依赖只在读写文件时导入，这里仅检查是否已安装
+# calamine引擎解析速度远快于openpyxl，xlsxwriter引擎写入速度远快于openpyxl
+HAS_CALAMINE = importlib.util.find_spec('python_calamine') is not None
+HAS_XLSXWRITER = importlib.util.find_spec('xlsxwriter') is not None
+
+# numba可选，导入和编译耗时较长，只在逐行计算的数据足够多时才加载p_value_numba中的内核
+HAS_NUMBA = importlib.util.find_spec('numba') is not None
+
+# Excel输入列及其数据类型，其中REQUIRED_COLUMNS为必要列，其余列可选
+COLUMN_DTYPES = {
+    'coefficient': 'float64',
+    'std_error': 'float64',
+    'sample_size': 'int64',
+    'significant_level': 'float64',
+    'num_predictors': 'int64',
+    'regression_type': 'string'
+}
+REQUIRED_COLUMNS = ('coefficient', 'std_error', 'sample_size')
+
+# 批量计算结果（含错误结果）的字段，按CSV输出顺序排列，重要字段在前
+RESULT_FIELDS = [
+    'coefficient', 'std_error', 'sample_size', 't_statistic', 'p_value', 'is_significant',
+    'alpha', 'confidence_interval', 'degrees_of_freedom', 'error', 'margin_of_error',
+    'num_predictors', 'regression_type', 'significant_level', 'used_alpha', 'used_regression_type'
+]
+
+# 按列计算结果的记录类型，每条结果存储为一段连续的定长字节
+# 回归类型可能是任意长度的非法取值，使用object类型保存原值，避免定长字符串截断
+RESULT_DTYPE = np.dtype([
+    ('coefficient', 'f8'),
+    ('std_error', 'f8'),
+    ('sample_size', 'i8'),
+    ('num_predictors', 'i8'),
+    ('degrees_of_freedom', 'i8'),
+    ('t_statistic', 'f8'),
+    ('p_value', 'f8'),
+    ('is_significant', '?'),
+    ('alpha', 'f8'),
+    ('ci_lower', 'f8'),
+    ('ci_upper', 'f8'),
+    ('margin_of_error', 'f8'),
+    ('used_regression_type', 'O'),
+    ('error_code', 'i1')
+])
+
+# 按列计算时的数据校验错误代码及对应的错误信息
+ERROR_REGRESSION_TYPE = 1
+ERROR_NUM_PREDICTORS = 2
+ERROR_STD_ERROR = 3
+ERROR_SAMPLE_SIZE = 4
+ERROR_MESSAGES = {
+    ERROR_REGRESSION_TYPE: "第{row_id}条数据的regression_type必须是'simple'或'multiple'，当前值: {regression_type}",
+    ERROR_NUM_PREDICTORS: "第{row_id}条数据缺少num_predictors字段",
+    ERROR_STD_ERROR: "第{row_id}条数据的std_error必须大于0",
+    ERROR_SAMPLE_SIZE: "第{row_id}条数据的sample_size必须大于num_predictors + 1"
+}
+
+# 结果字段中文说明映射
+FIELD_DESCRIPTIONS = {
+    'row_id': '行号',
+    'coefficient': '回归系数',
+    'std_error': '标准误',
+    'sample_size': '样本数',
+    't_statistic': 't统计量',
+    'p_value': 'p值',
+    'is_significant': '是否显著',
+    'alpha': '显著性水平',
+    'used_alpha': '使用的显著性水平',
+    'confidence_interval': '置信区间',
+    'ci_lower': '置信区间下限',
+    'ci_upper': '置信区间上限',
+    'degrees_of_freedom': '自由度',
+    'margin_of_error': '误差幅度',
+    'num_predictors': '预测变量数',
+    'regression_type': '回归类型',
+    'used_regression_type': '使用的回归类型',
+    'error_code': '错误代码',
+    'error': '错误信息',
+    'significant_level': '输入的显著性水平'
+}
+
+# 向量化路径使用int64存储样本数和预测变量数，超出该范围的值无法被float64精确表示，改走逐行计算路径
+COUNT_LIMIT = 2 ** 53
+
+# 系数、标准误和显著性水平为超出该值的整数时无法转换为float64，改走逐行计算路径
+FLOAT_MAX = sys.float_info.max
+
+# 自由度不超过该值时逐行计算使用numba内核，更大的自由度下连分式的舍入误差增大，改用scipy的stdtr
+NUMBA_DF_LIMIT = 1000
+
+# 每个进程逐行计算的数据条数超过该阈值时才使用numba内核，导入和加载内核约需0.5秒，每条数据约节省1微秒
+NUMBA_ROW_THRESHOLD = 500000
+
+# 逐行计算的数据条数超过该阈值时启用多进程
+PARALLEL_THRESHOLD = 10000
+
+# 写入Excel的行数超过该阈值时启用ZIP64扩展
+ZIP64_ROW_THRESHOLD = 1000000
+
+# 分块读取Excel时每块的行数
+EXCEL_CHUNK_ROWS = 65536
+
+@lru_cache(maxsize=1024)
+def _t_critical(alpha: float, df: int) -> float:
     """
-    计算回归系数的p值
+    计算双侧检验的t临界值，按(显著性水平, 自由度)缓存结果
+    """
+    # alpha为0时置信区间为整个实数轴；stdtrit(df, 0)返回+inf，直接取负会得到反向的区间
+    if alpha / 2 == 0:
+        return math.inf
+    # t分布对称，上侧alpha/2分位数等于下侧分位数取负值
+    return float(-stdtrit(df, alpha / 2))
+
+def _calc_batch(coef, se, n, k, alpha) -> np.recarray:
+    """
+    向量化计算t统计量、p值和置信区间，所有参数均为等长数组
     
     参数:
-    coefficient: 回归系数
-    std_error: 标准差/标准误
-    sample_size: 样本数
-    alpha: 显著性水平，默认为0.05
+    coef: 回归系数
+    se: 标准误
+    n: 样本数
+    k: 预测变量个数 (简单线性回归为1)
+    alpha: 显著性水平
     
     返回:
-    dict: 包含t统计量、p值、自由度等信息的字典
+    np.recarray: 每条数据对应一条RESULT_DTYPE类型的计算结果
     """
-    # 计算自由度 (样本数 - 参数个数，这里假设是简单回归，自由度为n-2)
-    # 对于多元回归，自由度 = n - k - 1，其中k是解释变量个数
-    df = sample_size - 2  # 简单线性回归的自由度
+    coef = np.asarray(coef, dtype=np.float64)
+    se = np.asarray(se, dtype=np.float64)
+    n = np.asarray(n, dtype=np.int64)
+    k = np.asarray(k, dtype=np.int64)
+    alpha = np.asarray(alpha, dtype=np.float64)
+    if (se == 0).any():
+        raise ZeroDivisionError("float division by zero")
+    
+    # 计算自由度 (样本数 - 预测变量个数 - 1)
+    df = n - k - 1
+    
+    # 计算t统计量和p值 (双侧检验)
+    t_statistic = coef / se
+    # stdtr为t分布CDF的底层ufunc，用下尾概率计算可避免1 - cdf的精度损失
+    p_value = 2 * stdtr(df, -np.abs(t_statistic))
+    
+    # 计算置信区间，数据中不同的(显著性水平, 自由度)组合通常很少，只对去重后的组合计算临界值
+    # 按精确的显著性水平去重，不做取整，避免极小或非整齐的alpha被量化
+    pairs, inverse = np.unique(np.column_stack((alpha, df)), axis=0, return_inverse=True)
+    t_critical = np.array([_t_critical(float(a), int(d)) for a, d in pairs], dtype=np.float64)[inverse.reshape(-1)]
+    margin_error = t_critical * se
+    
+    # used_regression_type由调用方填写
+    records = np.zeros(len(coef), dtype=RESULT_DTYPE).view(np.recarray)
+    records.coefficient = coef
+    records.std_error = se
+    records.sample_size = n
+    records.num_predictors = k
+    records.degrees_of_freedom = df
+    records.t_statistic = t_statistic
+    records.p_value = p_value
+    records.is_significant = p_value < alpha
+    records.alpha = alpha
+    records.ci_lower = coef - margin_error
+    records.ci_upper = coef + margin_error
+    records.margin_of_error = margin_error
+    return records
+
+@lru_cache(maxsize=1)
+def _load_t_sf_numba():
+    """
+    导入numba编译的t分布生存函数内核，每个进程只导入一次
+    """
+    from p_value_numba import t_sf
+    return t_sf
+
+def _calc_one(coefficient, std_error, sample_size, num_predictors, alpha, t_sf=None) -> tuple:
+    """
+    计算单条数据的自由度、t统计量、p值、是否显著、置信区间下限、置信区间上限和误差幅度
+    
+    直接对标量做Python运算并调用SciPy的ufunc，不构建数组；非数值输入在运算时抛出TypeError，
+    自由度保留输入的数值类型 (样本数为小数时自由度也为小数)；
+    t_sf为_load_t_sf_numba返回的内核时，自由度在NUMBA_DF_LIMIT以内的数据用它计算p值
+    """
+    # 计算自由度 (样本数 - 预测变量个数 - 1)
+    df = sample_size - num_predictors - 1
     
     # 计算t统计量
     t_statistic = coefficient / std_error
     
-    # 计算p值 (双侧检验)
-    p_value = 2 * (1 - stats.t.cdf(abs(t_statistic), df))
+    # 计算p值 (双侧检验)，自由度在NUMBA_DF_LIMIT以内时numba内核与stdtr的相对误差小于1e-10
+    if t_sf is not None and 0 < df <= NUMBA_DF_LIMIT:
+        p_value = 2 * t_sf(abs(t_statistic), df)
+    else:
+        # 用下尾概率计算可避免1 - cdf的精度损失
+        p_value = 2 * float(stdtr(df, -abs(t_statistic)))
     
-    # 判断是否显著
-    is_significant = p_value < alpha
-    
-    # 计算置信区间 (95%)
-    t_critical = stats.t.ppf(1 - alpha/2, df)
-    margin_error = t_critical * std_error
-    ci_lower = coefficient - margin_error
-    ci_upper = coefficient + margin_error
+    # 计算置信区间
+    margin_error = _t_critical(alpha, df) * std_error
+    return (df, t_statistic, p_value, p_value < alpha,
+            coefficient - margin_error, coefficient + margin_error, margin_error)
+
+def _regression_result(coefficient, std_error, sample_size, num_predictors, alpha, t_sf=None) -> Dict:
+    """
+    计算单条数据并组装结果字典，num_predictors为None时按简单线性回归计算，结果中不含num_predictors
+    """
+    # 简单线性回归只有一个解释变量，自由度为n-2
+    # 对于多元回归，自由度 = n - k - 1，其中k是解释变量个数
+    df, t_statistic, p_value, is_significant, ci_lower, ci_upper, margin_error = _calc_one(
+        coefficient, std_error, sample_size, 1 if num_predictors is None else num_predictors, alpha, t_sf)
     
-    return {
+    result = {
         'coefficient': coefficient,
         'std_error': std_error,
-        'sample_size': sample_size,
+        'sample_size': sample_size
+    }
+    if num_predictors is not None:
+        result['num_predictors'] = num_predictors
+    result.update({
         'degrees_of_freedom': df,
         't_statistic': t_statistic,
         'p_value': p_value,
@@ -56,7 +240,23 @@ def calculate_p_value(coefficient, std_error, sample_size, alpha=0.05):
         'alpha': alpha,
         'confidence_interval': (ci_lower, ci_upper),
         'margin_of_error': margin_error
-    }
+    })
+    return result
+
+def calculate_p_value(coefficient, std_error, sample_size, alpha=0.05):
+    """
+    计算回归系数的p值
+    
+    参数:
+    coefficient: 回归系数
+    std_error: 标准差/标准误
+    sample_size: 样本数
+    alpha: 显著性水平，默认为0.05
+    
+    返回:
+    dict: 包含t统计量、p值、自由度等信息的字典
+    """
+    return _regression_result(coefficient, std_error, sample_size, None, alpha)
 
 def calculate_p_value_multiple_regression(coefficient, std_error, sample_size, num_predictors, alpha=0.05):
     """
@@ -72,37 +272,7 @@ def calculate_p_value_multiple_regression(coefficient, std_error, sample_size, n
     返回:
     dict: 包含t统计量、p值、自由度等信息的字典
     """
-    # 计算自由度 (样本数 - 预测变量个数 - 1)
-    df = sample_size - num_predictors - 1
-    
-    # 计算t统计量
-    t_statistic = coefficient / std_error
-    
-    # 计算p值 (双侧检验)
-    p_value = 2 * (1 - stats.t.cdf(abs(t_statistic), df))
-    
-    # 判断是否显著
-    is_significant = p_value < alpha
-    
-    # 计算置信区间 (95%)
-    t_critical = stats.t.ppf(1 - alpha/2, df)
-    margin_error = t_critical * std_error
-    ci_lower = coefficient - margin_error
-    ci_upper = coefficient + margin_error
-    
-    return {
-        'coefficient': coefficient,
-        'std_error': std_error,
-        'sample_size': sample_size,
-        'num_predictors': num_predictors,
-        'degrees_of_freedom': df,
-        't_statistic': t_statistic,
-        'p_value': p_value,
-        'is_significant': is_significant,
-        'alpha': alpha,
-        'confidence_interval': (ci_lower, ci_upper),
-        'margin_of_error': margin_error
-    }
+    return _regression_result(coefficient, std_error, sample_size, num_predictors, alpha)
 
 def print_results(results):
     """
@@ -123,6 +293,244 @@ def print_results(results):
     print(f"误差幅度: {results['margin_of_error']:.6f}")
     print("=" * 60)
 
+def _is_vectorizable(data: Dict, regression_type: str) -> bool:
+    """
+    判断单条数据是否字段完整、类型正确，可以走向量化计算路径
+    
+    取值是否有效（标准误、样本数、回归类型）由向量化路径中的掩码统一校验
+    """
+    counts = ('sample_size',)
+    if data.get('regression_type', regression_type) == "multiple":
+        counts += ('num_predictors',)
+    # 系数、标准误和显著性水平会被转换为float64，超出float64范围的整数等取值改走逐行计算路径
+    if not all(_is_finite_real(data.get(key)) for key in ('coefficient', 'std_error')):
+        return False
+    # 样本数和预测变量数会被转换为int64，只有有限、整数且在范围内的值才能无损转换
+    if not all(_is_count(data.get(key)) for key in counts):
+        return False
+    return 'significant_level' not in data or _is_finite_real(data['significant_level'])
+
+def _is_finite_real(value) -> bool:
+    """
+    判断取值能否转换为有限的float64，如NaN、无穷大或超出float64范围的整数均返回False
+    """
+    if isinstance(value, numbers.Integral):
+        return abs(value) <= FLOAT_MAX
+    return isinstance(value, numbers.Real) and math.isfinite(value)
+
+def _is_count(value) -> bool:
+    """
+    判断取值能否无损转换为int64，如NaN、小数或超出COUNT_LIMIT的值均返回False
+    """
+    if isinstance(value, numbers.Integral):
+        return abs(value) <= COUNT_LIMIT
+    return (isinstance(value, numbers.Real) and math.isfinite(value)
+            and float(value).is_integer() and abs(value) <= COUNT_LIMIT)
+
+def _error_result(i: int, data: Dict, message: str) -> Dict:
+    """
+    根据原始数据生成第i条数据的错误结果
+    """
+    return {
+        'row_id': i + 1,
+        'error': message,
+        'coefficient': data.get('coefficient', 'N/A'),
+        'std_error': data.get('std_error', 'N/A'),
+        'sample_size': data.get('sample_size', 'N/A'),
+        'significant_level': data.get('significant_level', 'N/A'),
+        'regression_type': data.get('regression_type', 'N/A')
+    }
+
+def _check_values(i: int, std_error, sample_size, num_predictors):
+    """
+    按与向量化路径相同的规则校验第i条数据的标准误和样本数，不通过时抛出ValueError
+    
+    样本数为NaN时不报错，与基线一样返回NaN结果
+    """
+    if not std_error > 0:
+        raise ValueError(ERROR_MESSAGES[ERROR_STD_ERROR].format(row_id=i + 1))
+    if sample_size <= num_predictors + 1:
+        raise ValueError(ERROR_MESSAGES[ERROR_SAMPLE_SIZE].format(row_id=i + 1))
+
+def _compute_one(args) -> Dict:
+    """
+    逐行计算单条数据的p值（模块级函数，便于多进程序列化）
+    
+    参数:
+    args: (行索引, 数据字典, 默认回归类型, 默认显著性水平, 是否使用numba内核) 元组
+    
+    返回:
+    Dict: 计算结果，出错时返回包含error字段的字典
+    """
+    i, data, regression_type, alpha, use_numba = args
+    try:
+        t_sf = _load_t_sf_numba() if use_numba else None
+        
+        # 使用数据中的显著性水平，如果没有则使用默认值
+        current_alpha = data.get('significant_level', alpha)
+        
+        # 使用数据中的回归类型，如果没有则使用默认值
+        current_regression_type = data.get('regression_type', regression_type)
+        
+        if current_regression_type == "simple":
+            _check_values(i, data['std_error'], data['sample_size'], 1)
+            result = _regression_result(
+                coefficient=data['coefficient'],
+                std_error=data['std_error'],
+                sample_size=data['sample_size'],
+                num_predictors=None,
+                alpha=current_alpha,
+                t_sf=t_sf
+            )
+        elif current_regression_type == "multiple":
+            if 'num_predictors' not in data:
+                raise ValueError(ERROR_MESSAGES[ERROR_NUM_PREDICTORS].format(row_id=i + 1))
+            _check_values(i, data['std_error'], data['sample_size'], data['num_predictors'])
+            result = _regression_result(
+                coefficient=data['coefficient'],
+                std_error=data['std_error'],
+                sample_size=data['sample_size'],
+                num_predictors=data['num_predictors'],
+                alpha=current_alpha,
+                t_sf=t_sf
+            )
+        else:
+            raise ValueError(ERROR_MESSAGES[ERROR_REGRESSION_TYPE].format(
+                row_id=i + 1, regression_type=current_regression_type))
+        
+        result['row_id'] = i + 1
+        result['used_alpha'] = current_alpha  # 记录实际使用的显著性水平
+        result['used_regression_type'] = current_regression_type  # 记录实际使用的回归类型
+        return result
+        
+    except Exception as e:
+        return _error_result(i, data, str(e))
+
+def batch_calculate_p_values_columnar(columns: Dict[str, np.ndarray], regression_type: str = "simple", alpha: float = 0.05) -> np.recarray:
+    """
+    按列批量计算p值，输入为NumPy数组，输出为结构化记录数组，不构建逐行字典
+    
+    参数:
+    columns: 列名到数组的映射，应包含:
+        - coefficient: 回归系数
+        - std_error: 标准误
+        - sample_size: 样本数
+        - num_predictors: 预测变量数 (存在多元回归数据时需要)
+        - significant_level: 显著性水平 (可选，如果提供则使用该列)
+        - regression_type: 回归类型 (可选，如果提供则使用该列)
+    regression_type: 默认回归类型 ("simple" 或 "multiple")
+    alpha: 默认显著性水平
+    
+    返回:
+    np.recarray: RESULT_DTYPE类型的结果记录数组，置信区间拆分为ci_lower和ci_upper两个字段，
+        校验未通过的行error_code非0 (含义见ERROR_MESSAGES)，可通过records_to_dicts转换为字典列表
+    """
+    coef = np.asarray(columns['coefficient'], dtype=np.float64)
+    se = np.asarray(columns['std_error'], dtype=np.float64)
+    n = np.asarray(columns['sample_size'], dtype=np.int64)
+    count = len(coef)
+    
+    # 使用数据中的显著性水平和回归类型，如果没有则使用默认值
+    if 'significant_level' in columns:
+        alphas = np.asarray(columns['significant_level'], dtype=np.float64)
+    else:
+        alphas = np.full(count, alpha, dtype=np.float64)
+    if 'regression_type' in columns:
+        types = np.asarray(columns['regression_type'], dtype=str)
+    else:
+        types = np.full(count, regression_type)
+    
+    # 简单回归的预测变量数为1，多元回归使用数据中的预测变量数
+    is_multiple = types == "multiple"
+    if 'num_predictors' in columns:
+        k = np.where(is_multiple, np.asarray(columns['num_predictors'], dtype=np.int64), 1)
+    else:
+        k = np.ones(count, dtype=np.int64)
+    
+    # 用掩码一次性校验所有行，代替逐行异常处理；后面的赋值会覆盖前面的，因此按优先级从低到高依次检查，
+    # 同一行有多个错误时只记录优先级最高的一项 (回归类型 > 缺少预测变量数 > 标准误 > 样本数)，与逐行路径的检查顺序一致
+    error_code = np.zeros(count, dtype=np.int8)
+    error_code[n <= k + 1] = ERROR_SAMPLE_SIZE
+    error_code[~(se > 0)] = ERROR_STD_ERROR
+    if 'num_predictors' not in columns:
+        error_code[is_multiple] = ERROR_NUM_PREDICTORS
+    error_code[~(is_multiple | (types == "simple"))] = ERROR_REGRESSION_TYPE
+    valid = error_code == 0
+    
+    if valid.all():
+        records = _calc_batch(coef, se, n, k, alphas)
+    else:
+        # 只对有效行做向量化计算，无效行保留输入值，计算结果填充为NaN
+        records = np.zeros(count, dtype=RESULT_DTYPE).view(np.recarray)
+        records.coefficient = coef
+        records.std_error = se
+        records.sample_size = n
+        records.num_predictors = k
+        records.degrees_of_freedom = n - k - 1
+        records.alpha = alphas
+        for name in ('t_statistic', 'p_value', 'ci_lower', 'ci_upper', 'margin_of_error'):
+            records[name] = np.nan
+        records[valid] = _calc_batch(coef[valid], se[valid], n[valid], k[valid], alphas[valid])
+    records.used_regression_type = types
+    records.error_code = error_code
+    return records
+
+def records_to_dicts(records: np.ndarray, row_ids: List[int] = None, input_fields=None) -> List[Dict]:
+    """
+    将按列计算的结果记录数组转换为batch_calculate_p_values格式的字典列表
+    
+    参数:
+    records: batch_calculate_p_values_columnar返回的结果记录数组
+    row_ids: 每条结果的行号，默认从1开始编号
+    input_fields: 输入数据包含的列名，给出时错误结果中输入缺少的列记为'N/A'，与batch_calculate_p_values一致
+    
+    返回:
+    List[Dict]: 计算结果字典列表
+    """
+    if row_ids is None:
+        row_ids = range(1, len(records) + 1)
+    # 错误结果按输入原样回显significant_level和regression_type，输入没有这两列时不回显默认值
+    has_alpha = input_fields is None or 'significant_level' in input_fields
+    has_regression_type = input_fields is None or 'regression_type' in input_fields
+    
+    results = []
+    # 整个记录数组一次性转换为Python对象，避免逐元素装箱
+    for row_id, (coefficient, std_error, sample_size, num_predictors, df, t_statistic, p_value, is_significant,
+                 alpha, ci_lower, ci_upper, margin_error, regression_type, error_code) in zip(row_ids, records.tolist()):
+        if error_code:
+            results.append({
+                'row_id': row_id,
+                'error': ERROR_MESSAGES[error_code].format(row_id=row_id, regression_type=regression_type),
+                'coefficient': coefficient,
+                'std_error': std_error,
+                'sample_size': sample_size,
+                'significant_level': alpha if has_alpha else 'N/A',
+                'regression_type': regression_type if has_regression_type else 'N/A'
+            })
+            continue
+        
+        result = {
+            'coefficient': coefficient,
+            'std_error': std_error,
+            'sample_size': sample_size
+        }
+        if regression_type == "multiple":
+            result['num_predictors'] = num_predictors
+        result.update({
+            'degrees_of_freedom': df,
+            't_statistic': t_statistic,
+            'p_value': p_value,
+            'is_significant': is_significant,
+            'alpha': alpha,
+            'confidence_interval': (ci_lower, ci_upper),
+            'margin_of_error': margin_error,
+            'row_id': row_id,
+            'used_alpha': alpha,  # 记录实际使用的显著性水平
+            'used_regression_type': regression_type  # 记录实际使用的回归类型
+        })
+        results.append(result)
+    return results
+
 def batch_calculate_p_values(data_list: List[Dict], regression_type: str = "simple", alpha: float = 0.05) -> List[Dict]:
     """
     批量计算p值，支持每行数据使用不同的回归类型
@@ -140,104 +548,218 @@ def batch_calculate_p_values(data_list: List[Dict], regression_type: str = "simp
     
     返回:
     List[Dict]: 包含所有计算结果的列表
+    
+    注意:
+    逐行计算的数据超过PARALLEL_THRESHOLD条时会启动多进程，在使用spawn方式创建进程的平台
+    (Windows、macOS)上，调用方的脚本入口必须放在 if __name__ == "__main__": 下
     """
-    results = []
+    results = [None] * len(data_list)
+    
+    # 预先筛选字段完整、类型正确的行走向量化计算路径，其余行走逐行计算路径
+    vector_rows = [i for i, data in enumerate(data_list) if _is_vectorizable(data, regression_type)]
+    
+    if vector_rows:
+        rows = [data_list[i] for i in vector_rows]
+        types = [data.get('regression_type', regression_type) for data in rows]
+        columns = {
+            'coefficient': [data['coefficient'] for data in rows],
+            'std_error': [data['std_error'] for data in rows],
+            'sample_size': [data['sample_size'] for data in rows],
+            'num_predictors': [data['num_predictors'] if t == "multiple" else 1 for data, t in zip(rows, types)],
+            'significant_level': [data.get('significant_level', alpha) for data in rows],
+            'regression_type': types
+        }
+        # 复用按列计算接口，字典列表接口只负责组装结果
+        records = batch_calculate_p_values_columnar(columns, regression_type, alpha)
+        error_codes = records.error_code.tolist()
+        valid_rows = [i for i, error_code in zip(vector_rows, error_codes) if not error_code]
+        valid_results = records_to_dicts(records[records.error_code == 0], [i + 1 for i in valid_rows])
+        for i, result in zip(valid_rows, valid_results):
+            results[i] = result
+        for i, error_code in zip(vector_rows, error_codes):
+            if error_code:
+                # 校验未通过的行按原始数据生成错误结果
+                data = data_list[i]
+                message = ERROR_MESSAGES[error_code].format(
+                    row_id=i + 1, regression_type=data.get('regression_type', regression_type))
+                results[i] = _error_result(i, data, message)
+    
+    # 无法向量化的行逐行计算，数量较多时使用多进程分摊Python开销
+    fallback_rows = [i for i, result in enumerate(results) if result is None]
+    ncpu = mp.cpu_count()
+    # 只有一个CPU时多进程只会增加进程启动和序列化开销
+    parallel = len(fallback_rows) > PARALLEL_THRESHOLD and ncpu > 1
+    # 每个进程分到的数据足够多时，加载numba内核的开销才能被摊薄
+    use_numba = HAS_NUMBA and len(fallback_rows) // (ncpu if parallel else 1) > NUMBA_ROW_THRESHOLD
+    tasks = ((i, data_list[i], regression_type, alpha, use_numba) for i in fallback_rows)
+    if parallel:
+        chunksize = max(1, len(fallback_rows) // (ncpu * 4))
+        with mp.Pool(ncpu) as pool:
+            computed = list(pool.imap(_compute_one, tasks, chunksize=chunksize))
+    else:
+        computed = [_compute_one(task) for task in tasks]
+    for i, result in zip(fallback_rows, computed):
+        results[i] = result
+    
+    return results
+
+def _values_to_columns(values: Dict[str, list]) -> Dict[str, np.ndarray]:
+    """
+    将逐行收集的单元格值按COLUMN_DTYPES转换为NumPy数组
     
-    for i, data in enumerate(data_list):
+    参数:
+    values: 列名到单元格值列表的映射
+    
+    返回:
+    Dict[str, np.ndarray]: 列名到数组的映射
+    """
+    columns = {}
+    for name, column in values.items():
+        if name == 'regression_type':
+            columns[name] = np.asarray([_cell_text(v) for v in column], dtype=str)
+        elif COLUMN_DTYPES[name] == 'int64':
+            columns[name] = _to_count_column(name, column)
+        else:
+            columns[name] = np.asarray(column, dtype=np.dtype(COLUMN_DTYPES[name]))
+    return columns
+
+def _cell_text(value) -> str:
+    """
+    将回归类型单元格转换为小写字符串，空单元格记为'nan'，整数值的数字不带小数部分
+    """
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return 'nan'
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip().lower()
+
+def _to_count_column(name: str, column) -> np.ndarray:
+    """
+    将样本数、预测变量数等整数列转换为int64数组，出现空值、小数或超出COUNT_LIMIT的值时抛出ValueError
+    """
+    values = np.asarray(column, dtype=np.float64)
+    invalid = ~(np.isfinite(values) & (values == np.round(values)) & (np.abs(values) <= COUNT_LIMIT))
+    if invalid.any():
+        raise ValueError(f"{name}列必须为整数，当前值: {values[np.argmax(invalid)]}")
+    return values.astype(np.int64)
+
+def _iter_sheet_rows(file_path: str, sheet_name: str = None):
+    """
+    逐行读取工作表，不加载整个工作表，空单元格统一返回None
+    
+    参数:
+    file_path: Excel文件路径
+    sheet_name: 工作表名称，默认为第一个工作表
+    """
+    if HAS_CALAMINE:
+        from python_calamine import CalamineWorkbook
+        
+        workbook = CalamineWorkbook.from_path(file_path)
         try:
-            # 使用数据中的显著性水平，如果没有则使用默认值
-            current_alpha = data.get('significant_level', alpha)
-            
-            # 使用数据中的回归类型，如果没有则使用默认值
-            current_regression_type = data.get('regression_type', regression_type)
-            
-            if current_regression_type == "simple":
-                result = calculate_p_value(
-                    coefficient=data['coefficient'],
-                    std_error=data['std_error'],
-                    sample_size=data['sample_size'],
-                    alpha=current_alpha
-                )
-            elif current_regression_type == "multiple":
-                if 'num_predictors' not in data:
-                    raise ValueError(f"第{i+1}条数据缺少num_predictors字段")
-                result = calculate_p_value_multiple_regression(
-                    coefficient=data['coefficient'],
-                    std_error=data['std_error'],
-                    sample_size=data['sample_size'],
-                    num_predictors=data['num_predictors'],
-                    alpha=current_alpha
-                )
+            if sheet_name is None:
+                sheet = workbook.get_sheet_by_index(0)
             else:
-                raise ValueError(f"第{i+1}条数据的regression_type必须是'simple'或'multiple'，当前值: {current_regression_type}")
-            
-            result['row_id'] = i + 1
-            result['used_alpha'] = current_alpha  # 记录实际使用的显著性水平
-            result['used_regression_type'] = current_regression_type  # 记录实际使用的回归类型
-            results.append(result)
-            
-        except Exception as e:
-            error_result = {
-                'row_id': i + 1,
-                'error': str(e),
-                'coefficient': data.get('coefficient', 'N/A'),
-                'std_error': data.get('std_error', 'N/A'),
-                'sample_size': data.get('sample_size', 'N/A'),
-                'significant_level': data.get('significant_level', 'N/A'),
-                'regression_type': data.get('regression_type', 'N/A')
-            }
-            results.append(error_result)
+                sheet = workbook.get_sheet_by_name(sheet_name)
+            # calamine用空字符串表示空单元格
+            for row in sheet.iter_rows():
+                yield [None if value == '' else value for value in row]
+        finally:
+            workbook.close()
+    else:
+        import openpyxl
+        
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            if sheet_name is None:
+                worksheet = workbook.worksheets[0]
+            elif sheet_name in workbook.sheetnames:
+                worksheet = workbook[sheet_name]
+            else:
+                raise ValueError(f"工作表 {sheet_name} 不存在")
+            yield from worksheet.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+
+def _iter_column_chunks(file_path: str, sheet_name: str = None, chunk: int = EXCEL_CHUNK_ROWS):
+    """
+    逐行读取工作表并按块转换为列数组，chunk为None时整个工作表作为一块返回 (即使没有数据行)
     
-    return results
+    参数:
+    file_path: Excel文件路径
+    sheet_name: 工作表名称，默认为第一个工作表
+    chunk: 每块的最大行数
+    """
+    rows = _iter_sheet_rows(file_path, sheet_name)
+    header = next(rows, None)
+    if header is None:
+        header = ()
+    
+    # 根据第一行建立列名到列索引的映射，只收集需要的列
+    index = {name: idx for idx, name in enumerate(header) if name is not None}
+    for name in REQUIRED_COLUMNS:
+        if name not in index:
+            raise KeyError(name)
+    wanted = [(name, index[name]) for name in COLUMN_DTYPES if name in index]
+    
+    values = {name: [] for name, _ in wanted}
+    count = 0
+    for row in rows:
+        # 跳过空行
+        if all(value is None for value in row):
+            continue
+        for name, idx in wanted:
+            values[name].append(row[idx])
+        count += 1
+        if count == chunk:
+            yield _values_to_columns(values)
+            values = {name: [] for name, _ in wanted}
+            count = 0
+    if count or chunk is None:
+        yield _values_to_columns(values)
 
-def load_data_from_excel(file_path: str, sheet_name: str = None) -> List[Dict]:
+def load_columns_from_excel(file_path: str, sheet_name: str = None) -> Dict[str, np.ndarray]:
     """
-    从Excel文件加载数据
+    从Excel文件按列加载数据
     
     参数:
     file_path: Excel文件路径
     sheet_name: 工作表名称，默认为第一个工作表
     
     返回:
-    List[Dict]: 数据字典列表
+    Dict[str, np.ndarray]: 列名到数组的映射，可选列仅在Excel中存在时提供
     """
+    import pandas as pd
+    
     try:
-        # 读取Excel文件
-        if sheet_name is None:
-            # 如果没有指定工作表，读取第一个工作表
-            df = pd.read_excel(file_path, sheet_name=0)
-        else:
-            df = pd.read_excel(file_path, sheet_name=sheet_name)
+        # 读取Excel文件，优先使用calamine引擎，不可用时回退到openpyxl只读模式
+        # 如果没有指定工作表，读取第一个工作表
+        if not HAS_CALAMINE:
+            # 使用openpyxl只读模式逐行读取，整个工作表作为一块返回，不创建DataFrame
+            return next(_iter_column_chunks(file_path, sheet_name, None))
+        # 预先指定各列类型，跳过pandas的类型推断；整数列先按float64读取，回归类型保留单元格原值，
+        # 跳过空行后与逐行读取路径一样由_values_to_columns统一转换和校验
+        dtypes = {name: 'float64' if dtype == 'int64' else dtype for name, dtype in COLUMN_DTYPES.items()}
+        dtypes['regression_type'] = object
+        df = pd.read_excel(file_path, sheet_name=0 if sheet_name is None else sheet_name,
+                           engine='calamine', dtype=dtypes)
         
         # 确保df是DataFrame而不是字典
         if isinstance(df, dict):
             # 如果返回的是字典，取第一个值
             df = list(df.values())[0]
         
-        data_list = []
+        # 跳过空行
+        df = df.dropna(how='all')
         
-        for _, row in df.iterrows():
-            data = {
-                'coefficient': float(row['coefficient']),
-                'std_error': float(row['std_error']),
-                'sample_size': int(row['sample_size'])
-            }
-            
-            # 支持significant_level字段
-            if 'significant_level' in df.columns:
-                data['significant_level'] = float(row['significant_level'])
-            
-            # 支持num_predictors字段
-            if 'num_predictors' in df.columns:
-                data['num_predictors'] = int(row['num_predictors'])
-            
-            # 支持regression_type字段
-            if 'regression_type' in df.columns:
-                data['regression_type'] = str(row['regression_type']).strip().lower()
-            
-            data_list.append(data)
-            
-        return data_list
+        # 按列整体提取，避免iterrows逐行构造Series
+        values = {}
+        for name in COLUMN_DTYPES:
+            if name not in df.columns:
+                if name in REQUIRED_COLUMNS:
+                    raise KeyError(name)
+                continue
+            values[name] = df[name].to_numpy()
+        return _values_to_columns(values)
         
     except FileNotFoundError:
         raise FileNotFoundError(f"文件 {file_path} 不存在")
@@ -246,131 +768,229 @@ def load_data_from_excel(file_path: str, sheet_name: str = None) -> List[Dict]:
     except Exception as e:
         raise Exception(f"读取Excel文件时出错: {e}")
 
-def save_results_to_csv(results: List[Dict], output_path: str):
+def load_data_from_excel(file_path: str, sheet_name: str = None) -> List[Dict]:
+    """
+    从Excel文件加载数据
+    
+    参数:
+    file_path: Excel文件路径
+    sheet_name: 工作表名称，默认为第一个工作表
+    
+    返回:
+    List[Dict]: 数据字典列表
+    """
+    columns = load_columns_from_excel(file_path, sheet_name)
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*(columns[name].tolist() for name in names))]
+
+def iter_excel_chunks(file_path: str, sheet_name: str = None, chunk: int = EXCEL_CHUNK_ROWS):
+    """
+    分块读取Excel文件，每次返回一块按列组织的数据，内存占用只与块大小有关
+    
+    参数:
+    file_path: Excel文件路径
+    sheet_name: 工作表名称，默认为第一个工作表
+    chunk: 每块的最大行数
+    
+    返回:
+    Iterator[Dict[str, np.ndarray]]: 每块数据的列名到数组的映射，格式与load_columns_from_excel相同
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"文件 {file_path} 不存在")
+    
+    try:
+        yield from _iter_column_chunks(file_path, sheet_name, chunk)
+    except KeyError as e:
+        raise KeyError(f"Excel文件缺少必要的列: {e}")
+    except Exception as e:
+        raise Exception(f"读取Excel文件时出错: {e}")
+
+def save_results_to_csv(results: Union[List[Dict], np.ndarray], output_path: str):
     """
     将结果保存到CSV文件，第二行添加中文说明
     
     参数:
-    results: 计算结果列表
+    results: 计算结果列表，或batch_calculate_p_values_columnar返回的结果记录数组
     output_path: 输出文件路径
     """
-    if not results:
+    import csv
+    import io
+    import pandas as pd
+    
+    if len(results) == 0:
         print("没有结果可保存")
         return
     
-    # 移除row_id字段
-    cleaned_results = []
-    for result in results:
-        cleaned_result = {k: v for k, v in result.items() if k != 'row_id'}
-        cleaned_results.append(cleaned_result)
-    
-    # 获取所有可能的字段
-    all_fields = set()
-    for result in cleaned_results:
-        all_fields.update(result.keys())
-    
-    # 排序字段，将重要字段放在前面
-    priority_fields = ['coefficient', 'std_error', 'sample_size', 't_statistic', 'p_value', 'is_significant']
-    other_fields = sorted([f for f in all_fields if f not in priority_fields])
-    fieldnames = [f for f in priority_fields if f in all_fields] + other_fields
-    
-    # 字段中文说明映射
-    field_descriptions = {
-        'row_id': '行号',
-        'coefficient': '回归系数',
-        'std_error': '标准误',
-        'sample_size': '样本数',
-        't_statistic': 't统计量',
-        'p_value': 'p值',
-        'is_significant': '是否显著',
-        'alpha': '显著性水平',
-        'used_alpha': '使用的显著性水平',
-        'confidence_interval': '置信区间',
-        'degrees_of_freedom': '自由度',
-        'margin_of_error': '误差幅度',
-        'num_predictors': '预测变量数',
-        'regression_type': '回归类型',
-        'used_regression_type': '使用的回归类型'
-    }
+    if isinstance(results, np.ndarray):
+        # 结果记录数组直接构建DataFrame，不生成中间字典列表
+        df = pd.DataFrame.from_records(results)
+    else:
+        # 由pandas一次性收集所有字段，不再逐条遍历结果统计字段
+        # 使用object类型保留原始值，避免缺失字段使整数列被转换为浮点数
+        df = pd.DataFrame(results, dtype=object)
+        
+        # 按已知结果字段排序，未知字段按名称排在后面，并移除row_id字段
+        known_fields = [f for f in RESULT_FIELDS if f in df.columns]
+        other_fields = sorted(f for f in df.columns if f not in RESULT_FIELDS and f != 'row_id')
+        df = df[known_fields + other_fields]
+    
+    # 英文列名作为表头，中文说明作为第二行，全部内容先写入内存缓冲区，再一次性写入文件
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\r\n')
+    writer.writerow(df.columns)
+    writer.writerow([FIELD_DESCRIPTIONS.get(col, col) for col in df.columns])
+    df.to_csv(buffer, header=False, index=False, lineterminator='\r\n')
     
     with open(output_path, 'w', newline='', encoding='utf-8-sig') as file:
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        
-        # 写入英文列名
-        writer.writeheader()
-        
-        # 写入中文说明行
-        chinese_row = {}
-        for field in fieldnames:
-            chinese_row[field] = field_descriptions.get(field, field)
-        writer.writerow(chinese_row)
-        
-        # 写入数据
-        writer.writerows(cleaned_results)
+        file.write(buffer.getvalue())
     
     print(f"结果已保存到: {output_path}")
 
-def save_results_to_excel(results: List[Dict], output_path: str, sheet_name: str = "P值计算结果"):
+def save_results_to_excel(results: Union[List[Dict], np.ndarray], output_path: str, sheet_name: str = "P值计算结果"):
     """
     将结果保存到Excel文件，第二行添加中文说明
     
     参数:
-    results: 计算结果列表
+    results: 计算结果列表，或batch_calculate_p_values_columnar返回的结果记录数组
     output_path: 输出文件路径
     sheet_name: 工作表名称
     """
-    if not results:
+    import pandas as pd
+    
+    if len(results) == 0:
         print("没有结果可保存")
         return
     
     try:
-        # 移除row_id字段
-        cleaned_results = []
-        for result in results:
-            cleaned_result = {k: v for k, v in result.items() if k != 'row_id'}
-            cleaned_results.append(cleaned_result)
-        
-        # 字段中文说明映射
-        field_descriptions = {
-            'coefficient': '回归系数',
-            'std_error': '标准误',
-            'sample_size': '样本数',
-            't_statistic': 't统计量',
-            'p_value': 'p值',
-            'is_significant': '是否显著',
-            'alpha': '显著性水平',
-            'used_alpha': '使用的显著性水平',
-            'confidence_interval': '置信区间',
-            'degrees_of_freedom': '自由度',
-            'margin_of_error': '误差幅度',
-            'num_predictors': '预测变量数',
-            'regression_type': '回归类型',
-            'used_regression_type': '使用的回归类型'
-        }
-        
-        # 创建DataFrame
-        df = pd.DataFrame(cleaned_results)
-        
-        # 创建中文说明行
-        chinese_row = {}
-        for col in df.columns:
-            chinese_row[col] = field_descriptions.get(col, col)
-        
-        # 将中文说明行插入到第二行
-        # 首先创建一个新的DataFrame，包含中文说明行
-        chinese_df = pd.DataFrame([chinese_row])
+        if isinstance(results, np.ndarray):
+            # 结果记录数组直接构建DataFrame
+            df = pd.DataFrame.from_records(results)
+        else:
+            # 移除row_id字段
+            cleaned_results = []
+            for result in results:
+                cleaned_result = {k: v for k, v in result.items() if k != 'row_id'}
+                cleaned_results.append(cleaned_result)
+            
+            # 创建DataFrame
+            df = pd.DataFrame(cleaned_results)
         
-        # 合并中文说明行和原始数据
-        result_df = pd.concat([chinese_df, df], ignore_index=True)
+        # 英文列名写在第一行，中文说明写在第二行，数据从第三行开始写入
+        # 表头单独写入，避免与数据合并导致整表复制和数值列退化为object类型
+        header_rows = [list(df.columns), [FIELD_DESCRIPTIONS.get(col, col) for col in df.columns]]
         
-        # 保存到Excel
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            result_df.to_excel(writer, sheet_name=sheet_name, index=False)
+        # 保存到Excel，优先使用写入速度更快的xlsxwriter引擎
+        engine = 'xlsxwriter' if HAS_XLSXWRITER else 'openpyxl'
+        with pd.ExcelWriter(output_path, engine=engine) as writer:
+            if HAS_XLSXWRITER and len(df) > ZIP64_ROW_THRESHOLD:
+                # 超大结果文件可能超过4GB，需要启用ZIP64扩展
+                writer.book.use_zip64()
+            df.to_excel(writer, sheet_name=sheet_name, startrow=2, header=False, index=False)
+            
+            worksheet = writer.sheets[sheet_name]
+            for row_idx, row in enumerate(header_rows):
+                if HAS_XLSXWRITER:
+                    worksheet.write_row(row_idx, 0, row)
+                else:
+                    for col_idx, value in enumerate(row):
+                        worksheet.cell(row=row_idx + 1, column=col_idx + 1, value=value)
         
         print(f"结果已保存到: {output_path}")
     except Exception as e:
         print(f"保存Excel文件时出错: {e}")
 
+def save_result_chunks(result_chunks, csv_path: str, excel_path: str, sheet_name: str = "P值计算结果") -> int:
+    """
+    将分块计算的结果逐块追加写入CSV和Excel文件，第二行添加中文说明，同一时间只持有一块结果
+    
+    总字段事先未知，两个文件均按RESULT_FIELDS写出全部结果字段，不适用的字段留空；
+    写入中途出错时删除不完整的输出文件后重新抛出异常
+    
+    参数:
+    result_chunks: 结果字典列表的可迭代对象，每个元素为一块结果 (如records_to_dicts的返回值)
+    csv_path: CSV输出文件路径
+    excel_path: Excel输出文件路径
+    sheet_name: 工作表名称
+    
+    返回:
+    int: 写入的结果条数
+    """
+    import csv
+    import pandas as pd
+    
+    header_rows = [RESULT_FIELDS, [FIELD_DESCRIPTIONS.get(col, col) for col in RESULT_FIELDS]]
+    
+    # Excel优先使用xlsxwriter的constant_memory模式按行写出，否则使用openpyxl的只写模式
+    if HAS_XLSXWRITER:
+        import xlsxwriter
+        workbook = xlsxwriter.Workbook(excel_path, {'constant_memory': True})
+        worksheet = workbook.add_worksheet(sheet_name)
+    else:
+        import openpyxl
+        workbook = openpyxl.Workbook(write_only=True)
+        worksheet = workbook.create_sheet(sheet_name)
+    
+    row_idx = 0
+    completed = False
+    try:
+        with open(csv_path, 'w', newline='', encoding='utf-8-sig') as file:
+            writer = csv.writer(file, lineterminator='\r\n')
+            for row in header_rows:
+                writer.writerow(row)
+                _append_excel_row(worksheet, row_idx, row)
+                row_idx += 1
+            
+            for results in result_chunks:
+                # 使用object类型保留原始值，与save_results_to_csv一致
+                df = pd.DataFrame(results, columns=RESULT_FIELDS, dtype=object)
+                df.to_csv(file, header=False, index=False, lineterminator='\r\n')
+                for result in results:
+                    _append_excel_row(worksheet, row_idx, [_excel_value(result.get(f)) for f in RESULT_FIELDS])
+                    row_idx += 1
+                if HAS_XLSXWRITER and row_idx > ZIP64_ROW_THRESHOLD:
+                    # 总行数事先未知，超过阈值后再启用ZIP64扩展
+                    workbook.use_zip64()
+        completed = True
+    finally:
+        if HAS_XLSXWRITER:
+            # 出错时也要关闭，释放constant_memory模式的临时文件
+            workbook.close()
+        elif completed:
+            workbook.save(excel_path)
+        else:
+            # 未保存时也要结束只写工作表，关闭其临时文件
+            worksheet.close()
+        if not completed:
+            for path in (csv_path, excel_path):
+                if os.path.exists(path):
+                    os.remove(path)
+    
+    print(f"结果已保存到: {csv_path}")
+    print(f"结果已保存到: {excel_path}")
+    return row_idx - len(header_rows)
+
+def _append_excel_row(worksheet, row_idx: int, row: list):
+    """
+    向xlsxwriter或openpyxl只写模式的工作表追加一行
+    """
+    if HAS_XLSXWRITER:
+        worksheet.write_row(row_idx, 0, row)
+    else:
+        worksheet.append(row)
+
+def _excel_value(value):
+    """
+    将结果字段转换为可写入单元格的值，置信区间等元组写为字符串，NaN写为空单元格，
+    正负无穷写为'inf'/'-inf'字符串 (xlsxwriter不支持写入NaN和无穷大，与DataFrame.to_excel的默认处理一致)
+    """
+    if isinstance(value, tuple):
+        return str(value)
+    if isinstance(value, float) and not math.isfinite(value):
+        if math.isnan(value):
+            return None
+        return 'inf' if value > 0 else '-inf'
+    return value
+
 def save_results_to_json(results: List[Dict], output_path: str):
     """
     将结果保存到JSON文件
@@ -379,6 +999,8 @@ def save_results_to_json(results: List[Dict], output_path: str):
     results: 计算结果列表
     output_path: 输出文件路径
     """
+    import json
+    
     try:
         with open(output_path, 'w', encoding='utf-8') as file:
             json.dump(results, file, ensure_ascii=False, indent=2)
@@ -386,44 +1008,80 @@ def save_results_to_json(results: List[Dict], output_path: str):
     except Exception as e:
         print(f"保存JSON文件时出错: {e}")
 
-def print_batch_results(results: List[Dict]):
+def format_batch_results(results: List[Dict]) -> tuple:
     """
-    格式化打印批量结果
+    将批量结果格式化为打印行，同时统计错误数和显著数，可对分块结果逐块调用后累计
+    
+    参数:
+    results: 计算结果列表
+    
+    返回:
+    tuple: (打印行列表, 错误数, 显著数)
+    """
+    # 一次遍历同时完成统计和逐行格式化
+    error_line = f"{'ERROR':<10} {'ERROR':<10} {'ERROR':<8} {'ERROR':<10} {'ERROR':<12} {'ERROR':<6} {'ERROR':<8} {'ERROR':<8}"
+    get_fields = operator.itemgetter('coefficient', 'std_error', 'sample_size', 't_statistic', 'p_value', 'is_significant')
+    lines = []
+    error_count = 0
+    significant_count = 0
+    
+    for result in results:
+        if 'error' in result:
+            error_count += 1
+            lines.append(error_line)
+            continue
+        
+        coefficient, std_error, sample_size, t_stat, p_value, is_significant = get_fields(result)
+        if is_significant:
+            significant_count += 1
+        significant = "是" if is_significant else "否"
+        alpha_level = result.get('used_alpha', result.get('alpha', 0))
+        regression_type = result.get('used_regression_type', 'N/A')
+        
+        lines.append(f"{coefficient:<10.4f} {std_error:<10.4f} {sample_size:<8} {t_stat:<10.4f} {p_value:<12.6f} {significant:<6} {alpha_level:<8.3f} {regression_type:<8}")
+    
+    return lines, error_count, significant_count
+
+def print_batch_title():
+    """
+    打印批量结果的标题
     """
     print("=" * 80)
     print("批量P值计算结果")
     print("=" * 80)
-    
-    # 统计信息
-    total_count = len(results)
-    error_count = sum(1 for r in results if 'error' in r)
+
+def print_batch_counts(total_count: int, error_count: int, significant_count: int):
+    """
+    打印批量结果的统计信息
+    """
     success_count = total_count - error_count
-    significant_count = sum(1 for r in results if r.get('is_significant', False))
     
     print(f"总计算数: {total_count}")
     print(f"成功计算: {success_count}")
     print(f"计算错误: {error_count}")
     print(f"显著结果: {significant_count}")
     print("-" * 80)
-    
-    # 详细结果
+
+def print_batch_table_header():
+    """
+    打印详细结果的表头，之后逐行打印format_batch_results生成的打印行
+    """
     print(f"{'系数':<10} {'标准误':<10} {'样本数':<8} {'t统计量':<10} {'p值':<12} {'显著':<6} {'α水平':<8} {'回归类型':<8}")
     print("-" * 92)
+
+def print_batch_results(results: List[Dict]):
+    """
+    格式化打印批量结果
+    """
+    lines, error_count, significant_count = format_batch_results(results)
     
-    for result in results:
-        if 'error' in result:
-            print(f"{'ERROR':<10} {'ERROR':<10} {'ERROR':<8} {'ERROR':<10} {'ERROR':<12} {'ERROR':<6} {'ERROR':<8} {'ERROR':<8}")
-        else:
-            coefficient = f"{result.get('coefficient', 0):.4f}"
-            std_error = f"{result.get('std_error', 0):.4f}"
-            sample_size = result.get('sample_size', 'N/A')
-            t_stat = f"{result.get('t_statistic', 0):.4f}"
-            p_value = f"{result.get('p_value', 0):.6f}"
-            significant = "是" if result.get('is_significant', False) else "否"
-            alpha_level = f"{result.get('used_alpha', result.get('alpha', 0)):.3f}"
-            regression_type = result.get('used_regression_type', 'N/A')
-            
-            print(f"{coefficient:<10} {std_error:<10} {sample_size:<8} {t_stat:<10} {p_value:<12} {significant:<6} {alpha_level:<8} {regression_type:<8}")
+    print_batch_title()
+    # 统计信息
+    print_batch_counts(len(results), error_count, significant_count)
+    # 详细结果
+    print_batch_table_header()
+    if lines:
+        print("\n".join(lines))
 
 if __name__ == "__main__":
     # 示例用法
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+numba编译的t分布生存函数内核
+由p_value_calculator在逐行计算的数据量较大时按需导入，导入本模块需要安装numba
+"""
+
+import math
+
+from numba import njit
+
+@njit(cache=True)
+def _betacf(a, b, x):
+    """
+    正则化不完全贝塔函数的连分式部分 (修正Lentz算法)
+    """
+    tiny = 1e-300
+    qab = a + b
+    qap = a + 1.0
+    qam = a - 1.0
+    c = 1.0
+    d = 1.0 - qab * x / qap
+    if abs(d) < tiny:
+        d = tiny
+    d = 1.0 / d
+    h = d
+    for m in range(1, 10001):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        if abs(d) < tiny:
+            d = tiny
+        c = 1.0 + aa / c
+        if abs(c) < tiny:
+            c = tiny
+        d = 1.0 / d
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        if abs(d) < tiny:
+            d = tiny
+        c = 1.0 + aa / c
+        if abs(c) < tiny:
+            c = tiny
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-15:
+            break
+    return h
+
+@njit(cache=True)
+def _betainc(a, b, x, y):
+    """
+    正则化不完全贝塔函数 I_x(a, b)，y = 1 - x 由调用方精确给出以避免x接近1时的精度损失
+    """
+    if x <= 0.0:
+        return 0.0
+    if y <= 0.0:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                     + a * math.log(x) + b * math.log(y))
+    # 按收敛较快的一侧计算连分式
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, y) / b
+
+@njit(cache=True)
+def t_sf(t, df):
+    """
+    t分布的生存函数 P(T > t)，P(T > |t|) = I_x(df/2, 1/2) / 2，其中 x = df / (df + t^2)
+    """
+    if df <= 0:
+        return math.nan
+    t2 = t * t
+    tail = 0.5 * _betainc(0.5 * df, 0.5, df / (df + t2), t2 / (df + t2))
+    return tail if t >= 0 else 1.0 - tail
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+batch_calculate_p_values的取值校验和路径一致性测试
+"""
+
+import math
+import unittest
+
+import p_value_calculator as pvc
+
+BASE = {'coefficient': 2.5, 'std_error': 0.8, 'sample_size': 100}
+
+
+class TestUnvectorizableRows(unittest.TestCase):
+    def test_out_of_range_values_only_fail_their_own_row(self):
+        # 无法转换为float64/int64的取值走逐行计算路径，只影响所在行
+        rows = [
+            dict(BASE, coefficient=10 ** 400),
+            dict(BASE, std_error=10 ** 400),
+            dict(BASE, significant_level=10 ** 400),
+            dict(BASE, sample_size=10 ** 20),
+            BASE
+        ]
+        results = pvc.batch_calculate_p_values(rows)
+        self.assertEqual(['error' in r for r in results], [True, True, True, False, False])
+        self.assertAlmostEqual(results[-1]['p_value'], pvc.calculate_p_value(2.5, 0.8, 100)['p_value'], places=12)
+
+    def test_non_integral_counts_keep_fractional_df(self):
+        results = pvc.batch_calculate_p_values([
+            dict(BASE, sample_size=100.7),
+            dict(BASE, sample_size=math.nan),
+            dict(BASE, regression_type='multiple', num_predictors=2.5)
+        ])
+        self.assertAlmostEqual(results[0]['degrees_of_freedom'], 98.7)
+        self.assertTrue(math.isnan(results[1]['p_value']))
+        self.assertAlmostEqual(results[2]['degrees_of_freedom'], 96.5)
+
+
+# (说明, 数据, 期望的错误代码)；同一行有多个错误时按回归类型 > 缺少预测变量数 > 标准误 > 样本数的优先级报告
+INVALID_ROWS = [
+    ('zero std_error', dict(BASE, std_error=0.0), pvc.ERROR_STD_ERROR),
+    ('negative std_error', dict(BASE, std_error=-0.8), pvc.ERROR_STD_ERROR),
+    ('nan std_error', dict(BASE, std_error=math.nan), pvc.ERROR_STD_ERROR),
+    ('simple n <= k + 1', dict(BASE, sample_size=2), pvc.ERROR_SAMPLE_SIZE),
+    ('multiple n <= k + 1', dict(BASE, regression_type='multiple', num_predictors=99), pvc.ERROR_SAMPLE_SIZE),
+    ('bad regression_type', dict(BASE, regression_type='multiple_regression'), pvc.ERROR_REGRESSION_TYPE),
+    ('type beats std_error', dict(BASE, regression_type='x', std_error=0.0, sample_size=2), pvc.ERROR_REGRESSION_TYPE),
+    ('std_error beats sample_size', dict(BASE, std_error=-1.0, sample_size=2), pvc.ERROR_STD_ERROR),
+    ('num_predictors beats std_error', dict(BASE, regression_type='multiple', std_error=0.0), pvc.ERROR_NUM_PREDICTORS),
+]
+
+
+class TestErrorCodes(unittest.TestCase):
+    def test_columnar_precedence(self):
+        for label, data, error_code in INVALID_ROWS:
+            columns = {name: [value] for name, value in data.items()}
+            records = pvc.batch_calculate_p_values_columnar(columns)
+            self.assertEqual(records.error_code[0], error_code, label)
+            expected = pvc.ERROR_MESSAGES[error_code].format(row_id=1, regression_type=data.get('regression_type'))
+            self.assertEqual(pvc.records_to_dicts(records)[0]['error'], expected, label)
+
+    def test_per_row_path_matches_vectorized_path(self):
+        # 同一条数据无论走向量化路径还是逐行计算路径，都得到相同的错误信息
+        for label, data, error_code in INVALID_ROWS:
+            vectorized = pvc.batch_calculate_p_values([data])[0]
+            per_row = pvc._compute_one((0, data, "simple", 0.05, False))
+            expected = pvc.ERROR_MESSAGES[error_code].format(row_id=1, regression_type=data.get('regression_type'))
+            self.assertEqual(vectorized.get('error'), expected, label)
+            self.assertEqual(per_row.get('error'), expected, label)
+            self.assertEqual(vectorized, per_row, label)
+
+    def test_missing_input_columns_reported_as_na(self):
+        # 输入缺少的列在错误结果中记为'N/A'，不回显默认值
+        for label, data, error_code in INVALID_ROWS:
+            columns = {name: [value] for name, value in data.items()}
+            records = pvc.batch_calculate_p_values_columnar(columns)
+            columnar = pvc.records_to_dicts(records, input_fields=columns.keys())[0]
+            per_row = pvc._compute_one((0, data, "simple", 0.05, False))
+            for key in ('significant_level', 'regression_type'):
+                self.assertEqual(columnar[key], per_row[key], f"{label}: {key}")
+        self.assertEqual(columnar['significant_level'], 'N/A')
+
+    def test_valid_rows_match_between_paths(self):
+        rows = [BASE, dict(BASE, regression_type='multiple', num_predictors=3, significant_level=0.01)]
+        for data, vectorized in zip(rows, pvc.batch_calculate_p_values(rows)):
+            per_row = pvc._compute_one((vectorized['row_id'] - 1, data, "simple", 0.05, False))
+            self.assertEqual(vectorized.keys(), per_row.keys())
+            for key in vectorized:
+                if isinstance(vectorized[key], float):
+                    self.assertAlmostEqual(vectorized[key], per_row[key], places=12, msg=key)
+                else:
+                    self.assertEqual(vectorized[key], per_row[key], key)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+标量接口与按列计算接口的置信区间测试
+"""
+
+import math
+import unittest
+
+from scipy import stats
+
+import p_value_calculator as pvc
+
+
+def columnar(coefficient, std_error, sample_size, alpha):
+    return pvc.batch_calculate_p_values_columnar({
+        'coefficient': [coefficient],
+        'std_error': [std_error],
+        'sample_size': [sample_size],
+        'significant_level': [alpha]
+    })[0]
+
+
+class TestConfidenceInterval(unittest.TestCase):
+    def test_alpha_is_not_rounded(self):
+        # 小于5e-7或不是1e-6整数倍的显著性水平都必须按原值计算临界值
+        for alpha in (5e-8, 0.05 / 20000, 1.5e-6, 0.05):
+            expected = stats.t.isf(alpha / 2, 98) * 1.0
+            scalar = pvc.calculate_p_value(10.0, 1.0, 100, alpha)
+            record = columnar(10.0, 1.0, 100, alpha)
+            self.assertAlmostEqual(scalar['margin_of_error'], expected, places=9, msg=f"alpha={alpha}")
+            self.assertAlmostEqual(record.margin_of_error, expected, places=9, msg=f"alpha={alpha}")
+            self.assertLess(scalar['confidence_interval'][0], scalar['confidence_interval'][1])
+
+    def test_zero_alpha_gives_whole_real_line(self):
+        # 与基线的ppf(1 - alpha/2)一致，alpha为0时区间为(-inf, inf)而不是反向的(inf, -inf)
+        scalar = pvc.calculate_p_value(10.0, 1.0, 100, 0)
+        record = columnar(10.0, 1.0, 100, 0.0)
+        self.assertEqual(scalar['confidence_interval'], (-math.inf, math.inf))
+        self.assertEqual((record.ci_lower, record.ci_upper), (-math.inf, math.inf))
+        self.assertEqual(record.margin_of_error, math.inf)
+        self.assertFalse(scalar['is_significant'])
+
+    def test_close_alphas_are_not_merged(self):
+        # 去重按精确值进行，相差很小的显著性水平各自使用自己的临界值
+        records = pvc.batch_calculate_p_values_columnar({
+            'coefficient': [10.0, 10.0],
+            'std_error': [1.0, 1.0],
+            'sample_size': [100, 100],
+            'significant_level': [1.5e-6, 1.5000001e-6]
+        })
+        self.assertNotEqual(records.margin_of_error[0], records.margin_of_error[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excel读取的引擎一致性测试：同一个工作簿在calamine、openpyxl和分块读取路径下结果相同
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import openpyxl
+
+import p_value_calculator as pvc
+
+HEADER = ['coefficient', 'std_error', 'sample_size', 'regression_type', 'num_predictors']
+
+
+def write_workbook(path, rows):
+    workbook = openpyxl.Workbook()
+    worksheet = workbook.active
+    worksheet.append(HEADER)
+    for row in rows:
+        worksheet.append(row)
+    workbook.save(path)
+
+
+def concat_chunks(chunks):
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+
+
+class TestLoaderParity(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def engines(self):
+        engines = [False]
+        if pvc.HAS_CALAMINE:
+            engines.append(True)
+        return engines
+
+    def load_all(self, path):
+        # 依次用每个引擎执行整表读取和分块读取
+        loaded = {}
+        for has_calamine in self.engines():
+            with mock.patch.object(pvc, 'HAS_CALAMINE', has_calamine):
+                loaded[('full', has_calamine)] = pvc.load_columns_from_excel(path)
+                loaded[('chunks', has_calamine)] = concat_chunks(list(pvc.iter_excel_chunks(path, chunk=2)))
+        return loaded
+
+    def test_same_columns_on_every_path(self):
+        path = self.path('data.xlsx')
+        write_workbook(path, [
+            [0.5, 0.1, 30, 'Simple ', 2],
+            [None, None, None, None, None],
+            [0.7, 0.2, 40, None, 2],
+            [0.9, 0.3, 50.0, 1, 3],
+            [1.1, None, 60, 'multiple', 4]
+        ])
+        loaded = self.load_all(path)
+        expected = {
+            'coefficient': [0.5, 0.7, 0.9, 1.1],
+            'sample_size': [30, 40, 50, 60],
+            'num_predictors': [2, 2, 3, 4],
+            'regression_type': ['simple', 'nan', '1', 'multiple']
+        }
+        for key, columns in loaded.items():
+            for name, values in expected.items():
+                self.assertEqual(columns[name].tolist(), values, f"{key} {name}")
+            self.assertEqual(columns['sample_size'].dtype, np.int64, key)
+            np.testing.assert_array_equal(columns['std_error'], [0.1, 0.2, 0.3, np.nan], err_msg=str(key))
+
+    def test_non_integral_count_rejected_on_every_path(self):
+        path = self.path('fraction.xlsx')
+        write_workbook(path, [[0.5, 0.1, 30, 'simple', 2], [0.5, 0.1, 100.5, 'simple', 2]])
+        for has_calamine in self.engines():
+            with mock.patch.object(pvc, 'HAS_CALAMINE', has_calamine):
+                with self.assertRaisesRegex(Exception, "sample_size列必须为整数，当前值: 100.5"):
+                    pvc.load_columns_from_excel(path)
+                with self.assertRaisesRegex(Exception, "sample_size列必须为整数，当前值: 100.5"):
+                    list(pvc.iter_excel_chunks(path))
+
+
+class TestSaveResultChunks(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.csv_path = os.path.join(self.tmpdir.name, 'results.csv')
+        self.excel_path = os.path.join(self.tmpdir.name, 'results.xlsx')
+
+    def engines(self):
+        engines = [False]
+        if pvc.HAS_XLSXWRITER:
+            engines.append(True)
+        return engines
+
+    def test_infinite_values_are_written(self):
+        # 标准误为无穷大或alpha为0时结果中含有无穷大，写入不能失败
+        results = pvc.batch_calculate_p_values([
+            {'coefficient': 0.5, 'std_error': float('inf'), 'sample_size': 100},
+            {'coefficient': 0.5, 'std_error': 0.1, 'sample_size': 100, 'significant_level': 0.0}
+        ])
+        for has_xlsxwriter in self.engines():
+            with mock.patch.object(pvc, 'HAS_XLSXWRITER', has_xlsxwriter):
+                count = pvc.save_result_chunks([results], self.csv_path, self.excel_path)
+            self.assertEqual(count, 2)
+            worksheet = openpyxl.load_workbook(self.excel_path).active
+            rows = list(worksheet.iter_rows(min_row=3, values_only=True))
+            fields = dict(zip(pvc.RESULT_FIELDS, rows[0]))
+            self.assertEqual(fields['std_error'], 'inf', has_xlsxwriter)
+            self.assertEqual(fields['confidence_interval'], '(-inf, inf)', has_xlsxwriter)
+            self.assertEqual(dict(zip(pvc.RESULT_FIELDS, rows[1]))['margin_of_error'], 'inf', has_xlsxwriter)
+
+    def test_failure_removes_partial_files(self):
+        def chunks():
+            yield pvc.batch_calculate_p_values([{'coefficient': 0.5, 'std_error': 0.1, 'sample_size': 100}])
+            raise RuntimeError("中途出错")
+
+        for has_xlsxwriter in self.engines():
+            with mock.patch.object(pvc, 'HAS_XLSXWRITER', has_xlsxwriter):
+                with self.assertRaises(RuntimeError):
+                    pvc.save_result_chunks(chunks(), self.csv_path, self.excel_path)
+            self.assertFalse(os.path.exists(self.csv_path))
+            self.assertFalse(os.path.exists(self.excel_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
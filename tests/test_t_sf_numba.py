@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+numba版t分布生存函数与scipy.special.stdtr的一致性测试
+"""
+
+import subprocess
+import sys
+import unittest
+
+import numpy as np
+from scipy.special import stdtr
+
+import p_value_calculator as pvc
+
+
+@unittest.skipUnless(pvc.HAS_NUMBA, "未安装numba")
+class TestTSfNumba(unittest.TestCase):
+    def assert_close_to_stdtr(self, dfs, ts, rtol):
+        t_sf = pvc._load_t_sf_numba()
+        for df in dfs:
+            for t in ts:
+                expected = stdtr(df, -t)
+                actual = t_sf(t, df)
+                self.assertLessEqual(abs(actual - expected), rtol * expected, f"df={df}, t={t}")
+
+    def test_integer_df_within_limit(self):
+        # 覆盖NUMBA_DF_LIMIT以内的全部整数自由度
+        self.assert_close_to_stdtr(range(1, pvc.NUMBA_DF_LIMIT + 1, 7), np.linspace(0.05, 40, 40), 1e-10)
+
+    def test_fractional_df(self):
+        self.assert_close_to_stdtr([0.5, 2.5, 98.7, 500.5, pvc.NUMBA_DF_LIMIT], np.linspace(0.05, 20, 40), 1e-10)
+
+    def test_small_t(self):
+        # t接近0时x接近1，需要由y = t^2 / (df + t^2)精确给出补数
+        self.assert_close_to_stdtr([2, 10, 1000], [1e-8, 1e-6, 1e-3], 1e-12)
+
+    def test_negative_t_and_invalid_df(self):
+        t_sf = pvc._load_t_sf_numba()
+        self.assertAlmostEqual(t_sf(-2.0, 10) + t_sf(2.0, 10), 1.0, places=15)
+        self.assertTrue(np.isnan(t_sf(2.0, 0)))
+
+    def test_fallback_row_with_kernel_matches_scalar(self):
+        # 逐行计算路径使用内核时，结果与使用stdtr的公开接口一致
+        for sample_size in (5, 100, 1002):
+            data = {'coefficient': 0.3, 'std_error': 0.1, 'sample_size': sample_size}
+            with_kernel = pvc._compute_one((0, data, "simple", 0.05, True))['p_value']
+            scalar = pvc.calculate_p_value(0.3, 0.1, sample_size)['p_value']
+            self.assertLessEqual(abs(with_kernel - scalar), 1e-10 * scalar, f"sample_size={sample_size}")
+
+
+class TestLazyImport(unittest.TestCase):
+    def test_scalar_api_does_not_import_numba(self):
+        # 导入模块和单次调用公开接口都不应加载numba
+        code = ("import sys, p_value_calculator as pvc; pvc.calculate_p_value(2.5, 0.8, 100); "
+                "pvc.batch_calculate_p_values([{'coefficient': '1', 'std_error': 0.8, 'sample_size': 100}]); "
+                "print('numba' in sys.modules)")
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), 'False')
+
+
+if __name__ == "__main__":
+    unittest.main()